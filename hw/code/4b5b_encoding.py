@@ -10,6 +10,8 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 
+import profiling
+
 # Исходное сообщение (то же, что во всех предыдущих отчётах)
 HEX_BYTES = [0xC0, 0xC0, 0xC4]  # "ААД"
 
@@ -85,7 +87,8 @@ def max_run_length(bits):
 
 def main():
     # --- Исходное сообщение ---
-    bits_orig = bytes_to_bits_msb(HEX_BYTES)
+    with profiling.stage('unpack', bits=len(HEX_BYTES) * 8):
+        bits_orig = bytes_to_bits_msb(HEX_BYTES)
     n_orig = len(bits_orig)
     print("Исходное сообщение: ААД")
     print("Hex (исходное):     ", bits_to_hex(bits_orig))
@@ -93,7 +96,8 @@ def main():
     print("Длина исходного:    ", n_orig, "бит")
 
     # --- Логическое кодирование 4B/5B ---
-    bits_enc = encode_4b5b(bits_orig)
+    with profiling.stage('encode_4b5b', bits=n_orig):
+        bits_enc = encode_4b5b(bits_orig)
     n_enc = len(bits_enc)
     print("\n--- После логического кодирования 4B/5B ---")
     print("Двоичный (4B/5B):   ", "".join(str(b) for b in bits_enc))
@@ -106,36 +110,43 @@ def main():
     print("Избыточность:       ", f"{(n_enc - n_orig)} бит ({redundancy:.2%})")
 
     # --- Временная диаграмма (физическое кодирование — NRZ) ---
-    t, v = nrz_encode(bits_enc)
-    fig, ax = plt.subplots(figsize=(14, 3))
-    ax.step(t, v, where='post', color='#1f77b4', linewidth=1.5)
-    ax.set_ylim(-1.5, 1.5)
-    ax.set_yticks([-1, 1])
-    ax.set_yticklabels(['Низкий', 'Высокий'])
-    ax.set_xlabel('Время (биты канала после 4B/5B), 1 ед. = 1 бит')
-    ax.set_ylabel('Уровень сигнала')
-    ax.set_title('4B/5B + NRZ: «ААД» (C0 C0 C4) — временная диаграмма')
-    n_bits = n_enc
-    ax.set_xticks([0, 5, 10, 15, 20, 25, 30])
-    ax.set_xticklabels(['0', '5', '10', '15', '20', '25', '30'])
-    ax.grid(True, axis='x', alpha=0.5)
-    ax.axhline(0, color='gray', linestyle='-', linewidth=0.5)
-    for x in range(1, n_bits):
-        ax.axvline(x, color='gray', linestyle='--', linewidth=0.5, alpha=0.7)
-    plt.tight_layout()
-    plt.savefig('d:/itmo/seti/4b5b_nrz_diagram.png', dpi=150, bbox_inches='tight')
+    with profiling.stage('encode_nrz', bits=n_enc):
+        t, v = nrz_encode(bits_enc)
+    with profiling.stage('render', bits=n_enc):
+        fig, ax = plt.subplots(figsize=(14, 3))
+        ax.step(t, v, where='post', color='#1f77b4', linewidth=1.5)
+        ax.set_ylim(-1.5, 1.5)
+        ax.set_yticks([-1, 1])
+        ax.set_yticklabels(['Низкий', 'Высокий'])
+        ax.set_xlabel('Время (биты канала после 4B/5B), 1 ед. = 1 бит')
+        ax.set_ylabel('Уровень сигнала')
+        ax.set_title('4B/5B + NRZ: «ААД» (C0 C0 C4) — временная диаграмма')
+        n_bits = n_enc
+        ax.set_xticks([0, 5, 10, 15, 20, 25, 30])
+        ax.set_xticklabels(['0', '5', '10', '15', '20', '25', '30'])
+        ax.grid(True, axis='x', alpha=0.5)
+        ax.axhline(0, color='gray', linestyle='-', linewidth=0.5)
+        for x in range(1, n_bits):
+            ax.axvline(x, color='gray', linestyle='--', linewidth=0.5, alpha=0.7)
+        plt.tight_layout()
+        plt.savefig('d:/itmo/seti/4b5b_nrz_diagram.png', dpi=150, bbox_inches='tight')
     print("\nВременная диаграмма сохранена: 4b5b_nrz_diagram.png")
 
     # --- Частотные характеристики для канала 100 Мбит/с и 1 Гбит/с ---
-    for C_name, C_Mbps in [("100 Мбит/с", 100), ("1 Гбит/с", 1000)]:
-        C_MHz = C_Mbps  # в формулах C в МГц
+    with profiling.stage('run_length', bits=n_enc):
         n = max_run_length(bits_enc)
-        f_v = C_MHz / 2
-        f_n = C_MHz / (2 * n)
-        f_half = (f_v + f_n) / 2
-        f_sr = (10 * (f_v/2) + 3 * (f_v/3) + 5 * (f_v/5) + 6 * (f_v/6)) / 24  # как для NRZ
-        S = f_v - f_n
-        F = f_v  # полоса от 0 до f_в
+    with profiling.stage('spectrum', bits=n_enc):
+        spectra = []
+        for C_name, C_Mbps in [("100 Мбит/с", 100), ("1 Гбит/с", 1000)]:
+            C_MHz = C_Mbps  # в формулах C в МГц
+            f_v = C_MHz / 2
+            f_n = C_MHz / (2 * n)
+            f_half = (f_v + f_n) / 2
+            f_sr = (10 * (f_v/2) + 3 * (f_v/3) + 5 * (f_v/5) + 6 * (f_v/6)) / 24  # как для NRZ
+            S = f_v - f_n
+            F = f_v  # полоса от 0 до f_в
+            spectra.append((C_name, f_v, f_n, f_half, f_sr, S, F))
+    for C_name, f_v, f_n, f_half, f_sr, S, F in spectra:
         print("\n" + "="*60)
         print(f"Канал C = {C_name} (после 4B/5B + NRZ, n_бит = {n_enc}, макс. серия n = {n})")
         print("="*60)
@@ -148,7 +159,8 @@ def main():
 
     # --- Сравнение с исходным NRZ (без 4B/5B) при C = 100 Мбит/с ---
     print("\n--- Сравнение с исходным физическим кодом NRZ (без 4B/5B) при C = 100 Мбит/с ---")
-    n_orig_run = max_run_length(bits_orig)
+    with profiling.stage('run_length', bits=n_orig):
+        n_orig_run = max_run_length(bits_orig)
     f_v_orig = 50
     f_n_orig = 100 / (2 * n_orig_run)
     S_orig = f_v_orig - f_n_orig
@@ -158,5 +170,7 @@ def main():
     print(f"После 4B/5B + NRZ:     {n_enc} бит, макс. серия n = {n}, S = {S_100:.2f} МГц")
     print("Вывод: 4B/5B ограничивает длинные серии (в 5-битных кодах не более 3 нулей подряд) → f_н выше.")
 
+    profiling.save('4b5b_profile')
+
 if __name__ == "__main__":
     main()
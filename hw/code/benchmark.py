@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк кодеров, анализаторов и отрисовки из скриптов hw/code.
+Для каждой функции и размера входа (по умолчанию 1 КБ … 1 МБ, максимум задаётся --max-size,
+вплоть до 1G) измеряются время, пропускная способность (бит/с) и пиковая память (tracemalloc).
+Отрисовка меряется на своей лестнице малых размеров (--plot-min … --plot-max).
+Результат — JSON: окружение, точки кривой масштабирования и показатель степени
+(наклон log(время)/log(размер)). С --compare сравнивается с прошлым прогоном.
+"""
+
+import argparse
+import importlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Модули с цифрой в начале имени (4b5b_encoding) обычным import не загрузить
+nrz = importlib.import_module('nrz_encoding')
+ami = importlib.import_module('ami_encoding')
+rz = importlib.import_module('rz_encoding')
+manchester = importlib.import_module('manchester_encoding')
+enc4b5b = importlib.import_module('4b5b_encoding')
+scrambler = importlib.import_module('scrambler_encoding')
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+def parse_size(text):
+    """'1K', '64M', '1G' → число байт."""
+    text = text.strip().upper().rstrip('B')
+    unit = text[-1] if text and text[-1] in SIZE_UNITS else ''
+    return int(float(text[:len(text) - len(unit)]) * SIZE_UNITS[unit])
+
+def size_ladder(min_size, max_size, factor=4):
+    """Размеры входа: min_size, min_size·factor, … до max_size включительно."""
+    sizes = []
+    s = min_size
+    while s < max_size:
+        sizes.append(s)
+        s *= factor
+    sizes.append(max_size)
+    return sizes
+
+def render_step_plot(t, v):
+    """Путь отрисовки как в скриптах (ступенчатый график + границы тактов), в память вместо файла."""
+    n_bits = int(t[-1]) if len(t) else 0
+    fig, ax = plt.subplots(figsize=(14, 3))
+    ax.step(t, v, where='post', color='#1f77b4', linewidth=1.5)
+    ax.set_ylim(-1.5, 1.5)
+    ax.grid(True, axis='x', alpha=0.5)
+    ax.axhline(0, color='gray', linestyle='-', linewidth=0.5)
+    for x in range(1, n_bits):
+        ax.axvline(x, color='gray', linestyle='--', linewidth=0.7, alpha=0.8)
+    plt.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getbuffer().nbytes
+
+# (имя, функция от списка бит, 'plot' — своя лестница размеров и один прогон под tracemalloc)
+CASES = [
+    ('nrz_encode',        nrz.nrz_encode,               None),
+    ('ami_encode',        ami.ami_encode,               None),
+    ('rz_encode_bipolar', rz.rz_encode_bipolar,         None),
+    ('manchester_encode', manchester.manchester_encode, None),
+    ('encode_4b5b',       enc4b5b.encode_4b5b,          None),
+    ('scramble_poly1',    scrambler.scramble_poly1,     None),
+    ('scramble_poly2',    scrambler.scramble_poly2,     None),
+    ('max_run_length',    nrz.max_run_length,           None),
+    # Отрисовка рисует по линии на каждый бит — отдельная лестница малых размеров
+    ('plot',              lambda bits: render_step_plot(*nrz.nrz_encode(bits)), 'plot'),
+]
+
+def make_bits(n_bytes, seed):
+    """Случайный вход: n_bytes байт → список бит (MSB first), как bytes_to_bits_msb."""
+    rng = np.random.default_rng(seed)
+    data = rng.integers(0, 256, n_bytes, dtype=np.uint8)
+    return np.unpackbits(data).tolist()
+
+def time_call(func, bits, repeat):
+    """Лучшее время из repeat запусков (без tracemalloc — он замедляет выполнение)."""
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(bits)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def peak_memory(func, bits):
+    """Пиковый прирост памяти (байт) и время одного вызова под tracemalloc."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        t0 = time.perf_counter()
+        func(bits)
+        seconds = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base, seconds
+
+def scaling_exponent(points):
+    """Наклон log(время) от log(бит) по МНК: 1 — линейно, 2 — квадратично."""
+    pts = [(p['bits'], p['seconds']) for p in points if p['seconds'] > 0]
+    if len(pts) < 2:
+        return None
+    x = np.log([p[0] for p in pts])
+    y = np.log([p[1] for p in pts])
+    return float(np.polyfit(x, y, 1)[0])
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def run(sizes, plot_sizes, repeat, budget, seed, only=None):
+    results = {}
+    for name, func, kind in CASES:
+        if only and name not in only:
+            continue
+        points = []
+        for n_bytes in (plot_sizes if kind == 'plot' else sizes):
+            bits = make_bits(n_bytes, seed)
+            if kind == 'plot':
+                # Отрисовка идёт секундами, а tracemalloc почти не влияет на время matplotlib —
+                # время и память берутся из одного прогона
+                peak, seconds = peak_memory(func, bits)
+            else:
+                seconds = time_call(func, bits, repeat)
+                peak, _ = peak_memory(func, bits)
+            n_bits = len(bits)
+            points.append({
+                'bytes': n_bytes,
+                'bits': n_bits,
+                'seconds': seconds,
+                'bits_per_s': n_bits / seconds if seconds > 0 else None,
+                'peak_bytes': peak,
+            })
+            rate = n_bits / seconds / 1e6 if seconds > 0 else math.inf
+            print(f"{name:<18} {n_bytes:>12} Б  {seconds:10.4f} с  "
+                  f"{rate:10.2f} Мбит/с  пик {peak / 2**20:9.2f} МБ",
+                  file=sys.stderr)
+            del bits
+            # Следующий размер больше в несколько раз — не начинаем, если бюджет уже исчерпан
+            if seconds > budget:
+                break
+        results[name] = {'points': points, 'scaling_exponent': scaling_exponent(points)}
+    return results
+
+def compare(current, previous, threshold):
+    """Регрессии: пропускная способность упала более чем на threshold на одинаковом размере."""
+    regressions = []
+    for name, res in current.items():
+        old = previous.get('results', {}).get(name)
+        if not old:
+            continue
+        old_by_size = {p['bytes']: p for p in old['points']}
+        for p in res['points']:
+            q = old_by_size.get(p['bytes'])
+            if not q or not q['bits_per_s'] or not p['bits_per_s']:
+                continue
+            ratio = p['bits_per_s'] / q['bits_per_s']
+            if ratio < 1 - threshold:
+                regressions.append({'case': name, 'bytes': p['bytes'], 'ratio': ratio})
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--min-size', default='1K')
+    ap.add_argument('--max-size', default='1M', help='до 1G; большие размеры требуют много памяти (списки бит)')
+    ap.add_argument('--factor', type=int, default=4, help='шаг по размеру (умножение)')
+    ap.add_argument('--plot-min', default='64', help='мин. размер входа для отрисовки')
+    ap.add_argument('--plot-max', default='1K', help='макс. размер входа для отрисовки')
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--budget', type=float, default=30.0,
+                    help='если один запуск дольше (с), большие размеры для функции пропускаются')
+    ap.add_argument('--seed', type=int, default=2024)
+    ap.add_argument('--only', nargs='*', help='имена функций из списка CASES')
+    ap.add_argument('-o', '--output', help='файл JSON (по умолчанию stdout)')
+    ap.add_argument('--compare', help='JSON прошлого прогона для поиска регрессий')
+    ap.add_argument('--threshold', type=float, default=0.2, help='допустимое падение бит/с (доля)')
+    args = ap.parse_args()
+    known = [name for name, _, _ in CASES]
+    unknown = [name for name in args.only or [] if name not in known]
+    if unknown:
+        ap.error(f"неизвестные функции: {', '.join(unknown)} (есть: {', '.join(known)})")
+
+    sizes = size_ladder(parse_size(args.min_size), parse_size(args.max_size), args.factor)
+    plot_sizes = size_ladder(parse_size(args.plot_min), parse_size(args.plot_max), args.factor)
+    results = run(sizes, plot_sizes, args.repeat, args.budget, args.seed, args.only)
+    report = {
+        'environment': environment(),
+        'params': {'sizes': sizes, 'plot_sizes': plot_sizes, 'repeat': args.repeat, 'seed': args.seed},
+        'results': results,
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous.get('environment') != report['environment']:
+            print("Внимание: окружение отличается от прошлого прогона", file=sys.stderr)
+        report['regressions'] = compare(results, previous, args.threshold)
+        for r in report['regressions']:
+            print(f"Регрессия: {r['case']} на {r['bytes']} Б — {r['ratio']:.0%} от прошлой скорости",
+                  file=sys.stderr)
+        status = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    sys.exit(status)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Сравнение кодов за один проход по корпусу: NRZ, AMI, RZ, манчестер, 4B/5B + NRZ,
+скремблирование (полином 2) + NRZ. Каждый файл читается блоками, каждый блок
+распаковывается в биты один раз, и по этим битам считаются все коды сразу.
+
+Для каждого кода: избыточность, макс. серия одинаковых уровней n (в тактах канала),
+баланс DC (средний уровень, 0 — нет постоянной составляющей), плотность переходов
+(переходов на такт) и спектр по формулам из скриптов: f_н = C/(2n), S = f_в - f_н.
+Итог — одна таблица по всему корпусу (с --per-file — и по каждому файлу).
+Без аргументов анализируется исходное сообщение «ААД» (C0 C0 C4).
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+import line_codes
+import profiling
+
+HEX_BYTES = [0xC0, 0xC0, 0xC4]  # "ААД"
+
+CHUNK_BYTES = 1 << 20
+
+# (ключ, название, f_в в долях C, отсчётов на такт)
+CODES = [
+    ('nrz',        'NRZ',              0.5, 1),
+    ('ami',        'AMI',              0.5, 1),
+    ('rz',         'RZ',               1.0, 2),
+    ('manchester', 'Манчестер',        1.0, 2),
+    ('4b5b_nrz',   '4B/5B + NRZ',      0.5, 1),
+    ('scr_nrz',    'Скремблер + NRZ',  0.5, 1),
+]
+
+class CodeStats:
+    """Накопитель по одному коду; уровни подаются блоками, серии и переходы
+    на стыках блоков учитываются. end_stream() — граница файла."""
+
+    def __init__(self, samples_per_bit):
+        self.spb = samples_per_bit
+        self.data_bits = 0
+        self.line_bits = 0
+        self.samples = 0
+        self.level_sum = 0
+        self.transitions = 0
+        self.best_run = 0
+        self.cur_run = 0
+        self.last = None
+
+    def update(self, levels, data_bits):
+        n = len(levels)
+        self.data_bits += data_bits
+        if n == 0:
+            return
+        self.samples += n
+        self.line_bits += n // self.spb
+        self.level_sum += int(levels.sum(dtype=np.int64))
+        starts = np.flatnonzero(levels[1:] != levels[:-1]) + 1
+        self.transitions += len(starts)
+        runs = np.diff(np.concatenate(([0], starts, [n])))
+        if self.last is not None:
+            if levels[0] == self.last:
+                runs[0] += self.cur_run
+            else:
+                self.transitions += 1
+                self.best_run = max(self.best_run, self.cur_run)
+        if len(runs) > 1:
+            self.best_run = max(self.best_run, int(runs[:-1].max()))
+        self.cur_run = int(runs[-1])
+        self.last = levels[-1]
+
+    def end_stream(self):
+        self.best_run = max(self.best_run, self.cur_run)
+        self.cur_run = 0
+        self.last = None
+
+    def merge(self, other):
+        for name in ('data_bits', 'line_bits', 'samples', 'level_sum', 'transitions'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.best_run = max(self.best_run, other.best_run, other.cur_run)
+
+    def max_run(self):
+        """Макс. серия в тактах канала (для RZ может быть 0.5)."""
+        return max(self.best_run, self.cur_run) / self.spb
+
+    def row(self, f_v_factor, C_MHz):
+        n = self.max_run()
+        f_v = C_MHz * f_v_factor
+        f_n = C_MHz / (2 * max(n, 1))  # серия короче такта (RZ) не поднимает f_н выше C/2
+        return {
+            'redundancy': (self.line_bits - self.data_bits) / self.line_bits if self.line_bits else 0.0,
+            'max_run': n,
+            'dc_mean': self.level_sum / self.samples if self.samples else 0.0,
+            'transition_density': self.transitions / self.line_bits if self.line_bits else 0.0,
+            'f_v': f_v,
+            'f_n': f_n,
+            'S': f_v - f_n,
+        }
+
+# Ключ CODES → код line_codes.StreamEncoder (остальные совпадают)
+STREAM_CODE = {'4b5b_nrz': '4b5b', 'scr_nrz': 'scr'}
+
+class Analyzer:
+    """Общий проход: блок байт → биты (один раз) → уровни всех кодов."""
+
+    def __init__(self):
+        self.stats = {key: CodeStats(spb) for key, _, _, spb in CODES}
+        self._reset_state()
+
+    def _reset_state(self):
+        self.encoders = {key: line_codes.StreamEncoder(STREAM_CODE.get(key, key)) for key, _, _, _ in CODES}
+
+    def feed(self, chunk):
+        with profiling.stage('unpack', bits=len(chunk) * 8):
+            bits = line_codes.unpack_bits(chunk)
+        n = len(bits)
+        with profiling.stage('encode', bits=n):
+            levels = {key: enc.encode(chunk, bits) for key, enc in self.encoders.items()}
+        with profiling.stage('statistics', bits=n):
+            for key, lv in levels.items():
+                self.stats[key].update(lv, n)
+
+    def end_stream(self):
+        for s in self.stats.values():
+            s.end_stream()
+        self._reset_state()
+
+def iter_chunks(path, chunk_bytes=CHUNK_BYTES):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+
+def iter_corpus(paths):
+    """Файлы и каталоги (рекурсивно) → пути к файлам в устойчивом порядке."""
+    for p in paths:
+        if os.path.isdir(p):
+            for root, dirs, files in os.walk(p):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield p
+
+def analyze_corpus(sources, C_MHz=100):
+    """sources: пары (имя, итератор блоков байт). Возвращает (итог по корпусу, по файлам)."""
+    total = {key: CodeStats(spb) for key, _, _, spb in CODES}
+    per_file = {}
+    for name, chunks in sources:
+        an = Analyzer()
+        for chunk in chunks:
+            an.feed(chunk)
+        an.end_stream()
+        per_file[name] = {key: an.stats[key].row(fv, C_MHz) for key, _, fv, _ in CODES}
+        for key in total:
+            total[key].merge(an.stats[key])
+    corpus = {key: total[key].row(fv, C_MHz) for key, _, fv, _ in CODES}
+    return corpus, per_file
+
+def format_table(rows, C_MHz):
+    head = (f"{'Код':<18}{'Избыт.':>8}{'Макс. n':>9}{'DC (ср.)':>10}"
+            f"{'Перех./такт':>13}{'f_в, МГц':>10}{'f_н, МГц':>10}{'S, МГц':>9}")
+    lines = [f"C = {C_MHz} Мбит/с", head, "-" * len(head)]
+    for key, title, _, _ in CODES:
+        r = rows[key]
+        lines.append(f"{title:<18}{r['redundancy']:>8.2%}{r['max_run']:>9g}{r['dc_mean']:>10.4f}"
+                     f"{r['transition_density']:>13.4f}{r['f_v']:>10g}{r['f_n']:>10.2f}{r['S']:>9.2f}")
+    return "\n".join(lines)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('paths', nargs='*', help='файлы или каталоги корпуса')
+    ap.add_argument('-C', '--rate', type=float, default=100, help='скорость канала, Мбит/с')
+    ap.add_argument('--per-file', action='store_true', help='печатать таблицу и для каждого файла')
+    ap.add_argument('--json', help='сохранить результаты в JSON')
+    args = ap.parse_args()
+
+    if args.paths:
+        sources = ((path, iter_chunks(path)) for path in iter_corpus(args.paths))
+    else:
+        sources = [('ААД', [bytes(HEX_BYTES)])]
+    corpus, per_file = analyze_corpus(sources, args.rate)
+
+    if args.per_file:
+        for name, rows in per_file.items():
+            print(f"\n=== {name}")
+            print(format_table(rows, args.rate))
+    print(f"\n=== Корпус: {len(per_file)} файл(ов)")
+    print(format_table(corpus, args.rate))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'C_MHz': args.rate, 'corpus': corpus, 'files': per_file}, f, ensure_ascii=False, indent=2)
+    profiling.save('compare_profile')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Потоковый контроль постоянной составляющей: текущая цифровая сумма (RDS) уровней,
+DC в скользящем окне и оценка дрейфа базовой линии (baseline wander).
+Проверяет утверждения «нет DC» для AMI и манчестера и показывает уход NRZ на длинных сериях.
+
+Уровни подаются блоками: RDS блока — cumsum плюс перенесённая сумма предыдущих блоков,
+окно — разность RDS через W отсчётов (хранится только хвост RDS длиной W), дрейф —
+выход фильтра нижних частот с постоянной τ (что «отрезает» разделительный конденсатор
+приёмника), через line_codes.lowpass1 с перенесённым состоянием. Память не зависит
+от длины потока.
+"""
+
+import argparse
+import importlib
+import json
+import math
+
+import numpy as np
+
+import line_codes
+
+HEX_BYTES = [0xC0, 0xC0, 0xC4]  # "ААД"
+
+class RunningDigitalSum:
+    """RDS, DC в окне из window тактов и дрейф базовой линии с постоянной tau тактов."""
+
+    def __init__(self, samples_per_bit=1, window=64, tau=100.0):
+        if window < 1:
+            raise ValueError("Окно DC должно быть не меньше 1 такта")
+        self.spb = samples_per_bit
+        self.window = window * samples_per_bit              # в отсчётах
+        self.a = math.exp(-1.0 / (tau * samples_per_bit))   # коэффициент ФНЧ на отсчёт
+        self.samples = 0
+        self.rds = 0
+        self.rds_min = 0
+        self.rds_max = 0
+        self.tail = np.zeros(self.window, dtype=np.int64)   # RDS последних W отсчётов (до начала — 0)
+        self.window_dc_max = 0.0
+        self.wander = 0.0
+        self.wander_max = 0.0
+
+    def feed(self, levels):
+        levels = np.asarray(levels, dtype=np.int64)
+        n = len(levels)
+        if n == 0:
+            return
+        rds = self.rds + np.cumsum(levels)
+        self.rds_min = min(self.rds_min, int(rds.min()))
+        self.rds_max = max(self.rds_max, int(rds.max()))
+        self.rds = int(rds[-1])
+
+        # Сумма уровней в окне, оканчивающемся на каждом отсчёте: RDS_t - RDS_{t-W}
+        ext = np.concatenate((self.tail, rds))
+        window_sum = ext[self.window:] - ext[:-self.window]
+        self.window_dc_max = max(self.window_dc_max, float(np.abs(window_sum).max()) / self.window)
+        self.tail = ext[-self.window:]
+
+        wander = line_codes.lowpass1(levels, self.a, self.wander)
+        self.wander = float(wander[-1])
+        self.wander_max = max(self.wander_max, float(np.abs(wander).max()))
+        self.samples += n
+
+    def feed_signal(self, v):
+        """v из (t, v) ami_encode / nrz_encode / manchester_encode."""
+        self.feed(line_codes.signal_levels(v))
+
+    def report(self):
+        spb = self.spb
+        return {
+            'bits': self.samples / spb,
+            'rds': self.rds / spb,
+            'rds_min': self.rds_min / spb,
+            'rds_max': self.rds_max / spb,
+            'dc_mean': self.rds / self.samples if self.samples else 0.0,
+            'window_bits': self.window / spb,
+            'window_dc_max': self.window_dc_max,
+            'wander_max': self.wander_max,
+        }
+
+def print_report(title, rep):
+    print("\n" + "=" * 60)
+    print(title)
+    print("=" * 60)
+    print(f"Бит:                        {rep['bits']:.0f}")
+    print(f"RDS (конец / мин / макс):   {rep['rds']:g} / {rep['rds_min']:g} / {rep['rds_max']:g}  (в тактах × уровень)")
+    print(f"Средний уровень (DC):       {rep['dc_mean']:.4f}")
+    print(f"Макс. DC в окне {rep['window_bits']:g} тактов: {rep['window_dc_max']:.4f}")
+    print(f"Макс. дрейф базовой линии:  {rep['wander_max']:.4f} (доля амплитуды)")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--code', choices=line_codes.STREAM_CODES, help='код для потока (по умолчанию — «ААД» в NRZ, AMI, манчестере)')
+    ap.add_argument('--bits', type=float, help='длина потока, бит (по умолчанию 1e6 случайных или весь --file)')
+    ap.add_argument('--file', help="брать данные из файла вместо случайных ('-' — stdin)")
+    ap.add_argument('--window', type=int, default=64, help='окно DC, тактов')
+    ap.add_argument('--tau', type=float, default=100.0, help='постоянная времени разделительной цепи, тактов')
+    ap.add_argument('--seed', type=int, default=2024)
+    ap.add_argument('--json', action='store_true')
+    args = ap.parse_args()
+    if args.bits is None and not args.file:
+        args.bits = 1e6
+    if args.bits is not None and math.isinf(args.bits) and not args.file:
+        ap.error("--bits inf — только вместе с --file")
+    if args.window < 1:
+        ap.error("--window должно быть не меньше 1")
+
+    reports = {}
+    if args.code is None:
+        # Исходное сообщение через функции самих скриптов
+        bits = np.unpackbits(np.array(HEX_BYTES, dtype=np.uint8)).tolist()
+        for name, module, func, spb in [
+            ('NRZ', 'nrz_encoding', 'nrz_encode', 1),
+            ('AMI', 'ami_encoding', 'ami_encode', 1),
+            ('Манчестер', 'manchester_encoding', 'manchester_encode', 2),
+        ]:
+            _, v = getattr(importlib.import_module(module), func)(bits)
+            mon = RunningDigitalSum(spb, min(args.window, len(bits)), args.tau)
+            mon.feed_signal(v)
+            reports[name] = mon.report()
+    else:
+        enc = line_codes.StreamEncoder(args.code)
+        mon = RunningDigitalSum(enc.samples_per_bit, args.window, args.tau)
+        for chunk in line_codes.iter_stream_chunks(args.bits, args.seed, args.file):
+            mon.feed(enc.encode(chunk))
+        reports[args.code] = mon.report()
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+        return
+    for name, rep in reports.items():
+        print_report(f"Постоянная составляющая: {name}", rep)
+
+if __name__ == "__main__":
+    main()
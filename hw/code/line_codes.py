@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Векторные (numpy) версии кодов из скриптов hw/code — для длинных потоков.
+Вместо пар (t, v) для графика возвращается последовательность уровней:
+1 отсчёт на бит для NRZ/AMI, 2 отсчёта (половины такта) для RZ и манчестера.
+Результаты совпадают с nrz_encode / ami_encode / rz_encode_bipolar / manchester_encode,
+encode_4b5b и scramble_poly1/2 (проверка — check_equivalence(), запуск: python line_codes.py).
+"""
+
+import importlib
+import math
+import sys
+
+import numpy as np
+
+# Таблица 4B/5B (IEEE 802.3 / FDDI), как TABLE_4B5B в 4b5b_encoding.py, индекс — 4 бита данных
+TABLE_4B5B = np.array([
+    0b11110, 0b01001, 0b10100, 0b10101, 0b01010, 0b01011, 0b01110, 0b01111,
+    0b10010, 0b10011, 0b10110, 0b10111, 0b11010, 0b11011, 0b11100, 0b11101,
+], dtype=np.uint8)
+
+# Полиномы скремблера из scrambler_encoding.py: B_i = A_i ⊕ B_{i-t1} ⊕ B_{i-t2}
+POLY1 = (3, 5)
+POLY2 = (5, 7)
+
+SAMPLES_PER_BIT = {'nrz': 1, 'ami': 1, 'rz': 2, 'manchester': 2}
+
+def unpack_bits(data):
+    """Байты (bytes, bytearray, memoryview, массив uint8) → массив бит uint8, MSB first."""
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+def signal_levels(v):
+    """v из (t, v) скриптов → уровни: на каждый отрезок постоянного уровня в v по две точки."""
+    return np.asarray(v)[0::2].astype(np.int8)
+
+def nrz_levels(bits):
+    """NRZ: 0 → -1, 1 → +1."""
+    return np.asarray(bits, dtype=np.int8) * 2 - 1
+
+def ami_levels(bits, next_one=1):
+    """AMI: 0 → 0; единицы поочерёдно +1 и -1, первая — next_one (для продолжения потока)."""
+    bits = np.asarray(bits, dtype=np.int8)
+    ones_before = np.cumsum(bits) - bits
+    polarity = np.where(ones_before % 2 == 0, next_one, -next_one).astype(np.int8)
+    return bits * polarity
+
+def ami_next_one(bits, next_one=1):
+    """Полярность следующей единицы после блока bits."""
+    return next_one if int(np.count_nonzero(bits)) % 2 == 0 else -next_one
+
+def rz_levels(bits):
+    """RZ биполярный: 1 → (+1, 0), 0 → (-1, 0)."""
+    pulse = nrz_levels(bits)
+    return np.column_stack([pulse, np.zeros_like(pulse)]).ravel()
+
+def manchester_levels(bits):
+    """Манчестер: 0 → (-1, +1) (низкий→высокий), 1 → (+1, -1)."""
+    first = nrz_levels(bits)
+    return np.column_stack([first, -first]).ravel()
+
+LEVELS = {
+    'nrz': nrz_levels,
+    'ami': ami_levels,
+    'rz': rz_levels,
+    'manchester': manchester_levels,
+}
+
+def encode_4b5b(bits):
+    """4B/5B: по 4 бита → 5 бит (длина кратна 4)."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    if len(bits) % 4 != 0:
+        raise ValueError("Длина битовой последовательности должна быть кратна 4")
+    nibbles = bits.reshape(-1, 4) @ np.array([8, 4, 2, 1], dtype=np.uint8)
+    codes = TABLE_4B5B[nibbles]
+    return ((codes[:, None] >> np.arange(4, -1, -1, dtype=np.uint8)) & 1).ravel()
+
+_scramble_tables = {}
+
+def _scramble_table(taps):
+    """Таблица на байт: индекс (состояние << 8) | байт A → байт B.
+    Состояние — последние max(taps) выходных бит, младший бит = B_{i-1}."""
+    table = _scramble_tables.get(taps)
+    if table is None:
+        depth = max(taps)
+        if depth > 8:
+            raise ValueError("Отводы скремблера должны быть не дальше 8 бит")
+        mask = (1 << depth) - 1
+        table = [0] * (1 << (depth + 8))
+        for state in range(1 << depth):
+            for a in range(256):
+                h, out = state, 0
+                for j in range(7, -1, -1):
+                    b = (a >> j) & 1
+                    for t in taps:
+                        b ^= (h >> (t - 1)) & 1
+                    h = ((h << 1) | b) & mask
+                    out = (out << 1) | b
+                table[(state << 8) | a] = out
+        _scramble_tables[taps] = table
+    return table
+
+def scramble_bytes(data, taps=POLY2, state=0):
+    """Скремблирование потока байт (MSB first): B_i = A_i ⊕ B_{i-t1} ⊕ B_{i-t2}, B_{i<0} = 0.
+    Возвращает (bytes, состояние) — состояние передаётся в следующий вызов для продолжения потока."""
+    taps = tuple(taps)
+    table = _scramble_table(taps)
+    mask = (1 << max(taps)) - 1
+    out = bytearray(len(data))
+    for i, a in enumerate(bytes(data)):
+        b = table[(state << 8) | a]
+        out[i] = b
+        state = b & mask
+    return bytes(out), state
+
+def lowpass1(x, a, y0=0.0):
+    """Рекурсия y_k = a·y_{k-1} + (1-a)·x_k без цикла по отсчётам (0 ≤ a ≤ 1).
+    Внутри куска y = a^(i+1)·(y0 + (1-a)·Σ x_j / a^(j+1)); длина куска такова, что a^m ≥ 1e-6 —
+    так деление на a^j не теряет точность. Возвращает y (float64), последний элемент — новое y0."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.empty(len(x))
+    if a <= 0:
+        y[:] = x
+        return y
+    m = len(x) if a >= 1 else max(1, int(np.log(1e-6) / np.log(a)))
+    for s in range(0, len(x), max(m, 1)):
+        xs = x[s:s + m]
+        p = a ** np.arange(1, len(xs) + 1)
+        ys = p * (y0 + (1 - a) * np.cumsum(xs / p))
+        y[s:s + len(xs)] = ys
+        y0 = ys[-1]
+    return y
+
+# Коды для потоковой обработки: 4b5b и scr — 4B/5B + NRZ и скремблер (полином 2) + NRZ
+STREAM_CODES = ['nrz', 'ami', 'rz', 'manchester', '4b5b', 'scr']
+
+class StreamEncoder:
+    """Кодер потока блоками байт → уровни; состояние (AMI, скремблер) переносится между блоками."""
+
+    def __init__(self, code):
+        self.code = code
+        self.ami_next = 1
+        self.scr_state = 0
+
+    @property
+    def samples_per_bit(self):
+        return SAMPLES_PER_BIT.get(self.code, 1)
+
+    def encode(self, chunk, bits=None):
+        """bits — уже распакованный chunk, если он есть (чтобы не распаковывать повторно)."""
+        if bits is None:
+            bits = unpack_bits(chunk)
+        if self.code == 'ami':
+            levels = ami_levels(bits, self.ami_next)
+            self.ami_next = ami_next_one(bits, self.ami_next)
+            return levels
+        if self.code == '4b5b':
+            return nrz_levels(encode_4b5b(bits))
+        if self.code == 'scr':
+            scrambled, self.scr_state = scramble_bytes(chunk, POLY2, self.scr_state)
+            return nrz_levels(unpack_bits(scrambled))
+        return LEVELS[self.code](bits)
+
+def iter_stream_chunks(n_bits=None, seed=None, source=None, chunk_bytes=1 << 17):
+    """Блоки байт потока длиной n_bits: из файла source ('-' — stdin) или случайные
+    из default_rng(seed). n_bits=None (или inf) — файл до конца, сколько бы он ни был длинным;
+    для случайных данных длина обязательна. Память — один блок."""
+    if n_bits is not None and math.isinf(n_bits):
+        n_bits = None
+    if n_bits is None and not source:
+        raise ValueError("Для случайного потока нужна длина n_bits")
+    rng = np.random.default_rng(seed)
+    n_bytes = None if n_bits is None else int(n_bits) // 8
+    if source == '-':
+        f = sys.stdin.buffer
+    else:
+        f = open(source, 'rb') if source else None
+    try:
+        done = 0
+        while n_bytes is None or done < n_bytes:
+            size = chunk_bytes if n_bytes is None else min(chunk_bytes, n_bytes - done)
+            chunk = f.read(size) if f else rng.integers(0, 256, size, dtype=np.uint8).tobytes()
+            if not chunk:
+                break
+            yield chunk
+            done += len(chunk)
+    finally:
+        if f and source != '-':
+            f.close()
+
+def check_equivalence(n_bits=4096, seed=2024):
+    """Сравнение с функциями скриптов на «ААД» и на n_bits случайных бит.
+    Возвращает список расхождений (пустой — всё совпало)."""
+    rng = np.random.default_rng(seed)
+    inputs = [bytes([0xC0, 0xC0, 0xC4]), rng.integers(0, 256, n_bits // 8, dtype=np.uint8).tobytes()]
+    scripts = {name: importlib.import_module(name) for name in [
+        'nrz_encoding', 'ami_encoding', 'rz_encoding', 'manchester_encoding',
+        '4b5b_encoding', 'scrambler_encoding']}
+    failures = []
+    for data in inputs:
+        bits = unpack_bits(data)
+        ref_bits = bits.tolist()
+        cases = [
+            ('nrz_encode', signal_levels(scripts['nrz_encoding'].nrz_encode(ref_bits)[1]), nrz_levels(bits)),
+            ('ami_encode', signal_levels(scripts['ami_encoding'].ami_encode(ref_bits)[1]), ami_levels(bits)),
+            ('rz_encode_bipolar', signal_levels(scripts['rz_encoding'].rz_encode_bipolar(ref_bits)[1]), rz_levels(bits)),
+            ('manchester_encode', signal_levels(scripts['manchester_encoding'].manchester_encode(ref_bits)[1]),
+             manchester_levels(bits)),
+            ('encode_4b5b', scripts['4b5b_encoding'].encode_4b5b(ref_bits), encode_4b5b(bits)),
+            ('scramble_poly1', scripts['scrambler_encoding'].scramble_poly1(ref_bits),
+             unpack_bits(scramble_bytes(data, POLY1)[0])),
+            ('scramble_poly2', scripts['scrambler_encoding'].scramble_poly2(ref_bits),
+             unpack_bits(scramble_bytes(data, POLY2)[0])),
+        ]
+        for name, expected, got in cases:
+            if not np.array_equal(np.asarray(expected), got):
+                failures.append(f"{name}: расхождение на {len(data)} байт")
+        # Блоки через StreamEncoder дают то же, что весь поток сразу
+        half = len(data) // 2
+        for code in ['ami', 'scr']:
+            enc = StreamEncoder(code)
+            whole = StreamEncoder(code).encode(data)
+            if not np.array_equal(np.concatenate((enc.encode(data[:half]), enc.encode(data[half:]))), whole):
+                failures.append(f"StreamEncoder('{code}'): блоки не совпадают с потоком на {len(data)} байт")
+    return failures
+
+if __name__ == "__main__":
+    problems = check_equivalence()
+    for p in problems:
+        print(p)
+    print("Расхождений нет" if not problems else f"Расхождений: {len(problems)}")
+    raise SystemExit(1 if problems else 0)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Локальный asyncio-сервис линейного кодирования: несколько клиентов одновременно
+отправляют потоки байт и получают закодированный поток обратно.
+
+Протокол (TCP на 127.0.0.1 или Unix-сокет): кадры «4 байта длины (big-endian) + данные».
+  1. Клиент → заголовок JSON:
+       {"op": "encode", "code": "4b5b"}        — код из line_codes.STREAM_CODES, ответ — уровни int8
+       {"op": "scramble", "taps": [5, 7]}      — скремблирование, ответ — байты (MSB first)
+  2. Сервер → JSON {"ok": true, "format": "int8" | "bytes", "samples_per_bit": n}
+     или {"ok": false, "error": "..."} (соединение закрывается).
+  3. Клиент → кадры данных; пустой кадр — конец. Сервер → на каждый кадр данных один
+     или несколько кадров ответа (уровни — 8…16 байт на байт данных, поэтому ответ
+     режется на кадры не длиннее MAX_FRAME), в конце — пустой кадр.
+
+Управление потоком: на соединение — очередь из QUEUE_FRAMES кадров; когда она полна,
+сервер перестаёт читать сокет, и клиент упирается в окно TCP. Ответ пишется с drain().
+Кадры от MIN_OFFLOAD байт кодируются в общем пуле процессов (состояние кодера —
+AMI, скремблер — передаётся туда и обратно), мелкие — прямо в цикле событий.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import struct
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+
+import line_codes
+
+HEADER = struct.Struct('>I')
+MAX_FRAME = 16 << 20
+QUEUE_FRAMES = 4
+MIN_OFFLOAD = 64 << 10
+
+class ProtocolError(Exception):
+    pass
+
+async def read_frame(reader):
+    """Кадр целиком; None — соединение закрыто до начала кадра."""
+    try:
+        head = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("Обрыв заголовка кадра")
+        return None
+    (size,) = HEADER.unpack(head)
+    if size > MAX_FRAME:
+        raise ProtocolError(f"Кадр {size} байт больше предела {MAX_FRAME}")
+    return await reader.readexactly(size)
+
+async def write_frame(writer, payload):
+    writer.write(HEADER.pack(len(payload)) + payload)
+    await writer.drain()
+
+def parse_request(header):
+    """Заголовок JSON → (op, параметры, начальное состояние кодера, ответ сервера)."""
+    try:
+        req = json.loads(header)
+    except ValueError:
+        raise ProtocolError("Заголовок должен быть JSON")
+    if not isinstance(req, dict):
+        raise ProtocolError("Заголовок должен быть JSON-объектом")
+    op = req.get('op')
+    if op == 'encode':
+        code = req.get('code')
+        if code not in line_codes.STREAM_CODES:
+            raise ProtocolError(f"Неизвестный код: {code!r}")
+        reply = {'ok': True, 'format': 'int8',
+                 'samples_per_bit': line_codes.SAMPLES_PER_BIT.get(code, 1)}
+        return op, code, (1, 0), reply
+    if op == 'scramble':
+        taps = req.get('taps', list(line_codes.POLY2))
+        if (not isinstance(taps, list) or not taps
+                or not all(isinstance(t, int) and not isinstance(t, bool) and 1 <= t <= 8 for t in taps)):
+            raise ProtocolError("taps — список отводов от 1 до 8")
+        return op, tuple(taps), 0, {'ok': True, 'format': 'bytes'}
+    raise ProtocolError(f"Неизвестная операция: {op!r}")
+
+def process_chunk(op, params, state, chunk):
+    """Один кадр данных → (ответ, новое состояние). Вызывается и в пуле процессов."""
+    if op == 'scramble':
+        return line_codes.scramble_bytes(chunk, params, state)
+    enc = line_codes.StreamEncoder(params)
+    enc.ami_next, enc.scr_state = state
+    levels = enc.encode(chunk)
+    return levels.astype('int8').tobytes(), (enc.ami_next, enc.scr_state)
+
+class LineCodingServer:
+    def __init__(self, workers=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.active = 0
+
+    async def handle(self, reader, writer):
+        self.active += 1
+        try:
+            try:
+                header = await read_frame(reader)
+                if header is None:
+                    return
+                op, params, state, reply = parse_request(header)
+            except ProtocolError as e:
+                await write_frame(writer, json.dumps({'ok': False, 'error': str(e)}, ensure_ascii=False).encode())
+                return
+            await write_frame(writer, json.dumps(reply).encode())
+
+            queue = asyncio.Queue(maxsize=QUEUE_FRAMES)
+            producer = asyncio.create_task(self._read_data(reader, queue))
+            try:
+                await self._encode_data(queue, writer, op, params, state)
+            finally:
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+        except (ProtocolError, asyncio.IncompleteReadError, ConnectionError):
+            pass  # клиент прислал мусор или отключился — закрываем соединение
+        except BrokenExecutor:
+            pass  # процесс пула упал — поток не закончить, закрываем соединение
+        finally:
+            self.active -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_data(self, reader, queue):
+        """Кадры данных в очередь; put() ждёт, пока кодер не освободит место."""
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    raise ProtocolError("Соединение закрыто без завершающего кадра")
+                await queue.put(frame)
+                if not frame:
+                    return
+        except (ProtocolError, asyncio.IncompleteReadError, ConnectionError) as e:
+            await queue.put(e)
+
+    async def _encode_data(self, queue, writer, op, params, state):
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await queue.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                await write_frame(writer, b'')
+                return
+            if len(chunk) >= MIN_OFFLOAD:
+                out, state = await loop.run_in_executor(self.pool, process_chunk, op, params, state, chunk)
+            else:
+                out, state = process_chunk(op, params, state, chunk)
+            view = memoryview(out)
+            for pos in range(0, len(view), MAX_FRAME):
+                await write_frame(writer, view[pos:pos + MAX_FRAME])
+
+    async def serve(self, host='127.0.0.1', port=8765, unix=None):
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+            where = unix
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = ", ".join(str(s.getsockname()) for s in server.sockets)
+        print(f"Сервис линейного кодирования: {where}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+async def encode_stream(header, chunks, host='127.0.0.1', port=8765, unix=None):
+    """Клиент: отправить заголовок и блоки данных, вернуть (ответ сервера, склеенный результат).
+    Отправка и приём идут параллельно, так что большой поток не блокирует сам себя."""
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    sender = None
+    try:
+        await write_frame(writer, json.dumps(header).encode())
+        frame = await read_frame(reader)
+        if frame is None:
+            raise ProtocolError("Сервер закрыл соединение без ответа на заголовок")
+        reply = json.loads(frame)
+        if not reply.get('ok'):
+            return reply, b''
+
+        async def send():
+            for chunk in chunks:
+                if chunk:
+                    await write_frame(writer, chunk)
+            await write_frame(writer, b'')
+
+        sender = asyncio.create_task(send())
+        out = bytearray()
+        while True:
+            frame = await read_frame(reader)
+            if frame is None:
+                raise ProtocolError("Сервер закрыл соединение до конца потока")
+            if not frame:
+                break
+            out += frame
+        await sender
+        return reply, bytes(out)
+    except (ConnectionError, asyncio.IncompleteReadError) as e:
+        raise ProtocolError(f"Соединение с сервером оборвано: {e}") from e
+    finally:
+        if sender is not None and not sender.done():
+            sender.cancel()
+            try:
+                await sender
+            except (asyncio.CancelledError, ConnectionError):
+                pass
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def check(frame_bytes=3 << 20, workers=2):
+    """Самопроверка: по кадру frame_bytes случайных байт для каждого кода (и скремблера)
+    через сервер на свободном порту; ответ сравнивается с line_codes.StreamEncoder.
+    Размер по умолчанию даёт ответы длиннее MAX_FRAME для всех кодов.
+    Возвращает список расхождений (пустой — всё совпало)."""
+    srv = LineCodingServer(workers)
+    server = await asyncio.start_server(srv.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    data = os.urandom(frame_bytes)
+    failures = []
+    try:
+        async with server:
+            for code in line_codes.STREAM_CODES:
+                _, out = await encode_stream({'op': 'encode', 'code': code}, [data], port=port)
+                expected = line_codes.StreamEncoder(code).encode(data).astype('int8').tobytes()
+                if out != expected:
+                    failures.append(f"encode {code}: {len(out)} байт вместо {len(expected)}")
+            _, out = await encode_stream({'op': 'scramble', 'taps': list(line_codes.POLY2)}, [data], port=port)
+            if out != line_codes.scramble_bytes(data, line_codes.POLY2)[0]:
+                failures.append("scramble: ответ не совпадает с scramble_bytes")
+    finally:
+        srv.close()
+    return failures
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--unix', help='путь Unix-сокета вместо TCP')
+    ap.add_argument('--workers', type=int, default=os.cpu_count(), help='процессов в пуле')
+    ap.add_argument('--check', action='store_true',
+                    help='не запускать сервис, а проверить все коды на кадрах больше MAX_FRAME // 16')
+    args = ap.parse_args()
+
+    if args.check:
+        problems = asyncio.run(check())
+        for p in problems:
+            print(p)
+        print("Расхождений нет" if not problems else f"Расхождений: {len(problems)}")
+        raise SystemExit(1 if problems else 0)
+
+    srv = LineCodingServer(args.workers)
+    try:
+        asyncio.run(srv.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+
+if __name__ == "__main__":
+    main()
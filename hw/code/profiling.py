@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Инструментирование этапов конвейера (кодирование → серии → спектр → отрисовка).
+Включается переменной окружения LINECODE_PROFILE=1 или вызовом enable().
+Выключенный профилировщик почти ничего не стоит: stage() возвращает один и тот же
+пустой контекстный менеджер, без замеров времени и памяти.
+
+Для каждого этапа записываются: время (с), число обработанных бит, прирост и пик памяти
+Python-аллокаций (tracemalloc) и пиковый RSS процесса. Экспорт — JSON или трасса
+в формате Chrome Trace Event (открывается в chrome://tracing, Perfetto, speedscope как flame graph).
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource  # нет в Windows — тогда RSS не записываем
+except ImportError:
+    resource = None
+
+ENABLED = os.environ.get('LINECODE_PROFILE', '') not in ('', '0')
+
+_NOOP = contextlib.nullcontext()
+_records = []
+_open = []  # открытые этапы (вложенные — в конце)
+_t_origin = time.perf_counter()
+
+def peak_rss_bytes():
+    """Пиковый RSS процесса в байтах (None, если модуля resource нет)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт КБ, macOS — байты
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+class _Stage:
+    """Замер одного этапа. bits можно уточнить внутри блока: with stage('x') as s: s.bits = n.
+    Этапы можно вкладывать: пик tracemalloc один на процесс, поэтому перед его сбросом
+    внутренним этапом пик внешнего запоминается в peak, а на выходе внутреннего — дополняется."""
+
+    __slots__ = ('name', 'bits', 't0', 'mem0', 'peak')
+
+    def __init__(self, name, bits):
+        self.name = name
+        self.bits = bits
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            if _open:
+                parent = _open[-1]
+                parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self.mem0 = self.peak = tracemalloc.get_traced_memory()[0]
+            _open.append(self)
+        else:
+            self.mem0 = None
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        record = {
+            'stage': self.name,
+            'start_s': self.t0 - _t_origin,
+            'seconds': t1 - self.t0,
+            'bits': self.bits,
+            'bits_per_s': self.bits / (t1 - self.t0) if self.bits and t1 > self.t0 else None,
+            'alloc_bytes': None,
+            'alloc_peak_bytes': None,
+            'peak_rss_bytes': peak_rss_bytes(),
+        }
+        if self.mem0 is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.peak)
+            record['alloc_bytes'] = current - self.mem0
+            record['alloc_peak_bytes'] = peak - self.mem0
+            if _open and _open[-1] is self:
+                _open.pop()
+                if _open:
+                    _open[-1].peak = max(_open[-1].peak, peak)
+        _records.append(record)
+        return False
+
+def stage(name, bits=0):
+    """Контекстный менеджер этапа; при выключенном профилировании — пустой."""
+    if not ENABLED:
+        return _NOOP
+    return _Stage(name, bits)
+
+def enable(trace_allocations=True):
+    """Включить профилирование; trace_allocations — считать память через tracemalloc (медленнее)."""
+    global ENABLED
+    ENABLED = True
+    if trace_allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable():
+    global ENABLED
+    ENABLED = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def reset():
+    _records.clear()
+
+def records():
+    return list(_records)
+
+def to_chrome_trace(recs=None):
+    """Записи → Chrome Trace Event ('X'-события, время в микросекундах)."""
+    events = []
+    for r in (_records if recs is None else recs):
+        events.append({
+            'name': r['stage'],
+            'ph': 'X',
+            'ts': r['start_s'] * 1e6,
+            'dur': r['seconds'] * 1e6,
+            'pid': os.getpid(),
+            'tid': 0,
+            'args': {k: r[k] for k in ('bits', 'alloc_bytes', 'alloc_peak_bytes', 'peak_rss_bytes')},
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def save(prefix):
+    """Сохранить <prefix>.json (записи) и <prefix>.trace.json (трасса). Без профилирования — ничего."""
+    if not ENABLED:
+        return
+    with open(prefix + '.json', 'w', encoding='utf-8') as f:
+        json.dump(_records, f, ensure_ascii=False, indent=2)
+    with open(prefix + '.trace.json', 'w', encoding='utf-8') as f:
+        json.dump(to_chrome_trace(), f)
+    print(f"\nПрофиль этапов сохранён: {prefix}.json, {prefix}.trace.json")
+
+if ENABLED:
+    enable()
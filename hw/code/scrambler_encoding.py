@@ -13,6 +13,8 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 
+import step_trace
+
 HEX_BYTES = [0xC0, 0xC0, 0xC4]  # "ААД"
 
 def bytes_to_bits_msb(bytes_list):
@@ -41,24 +43,11 @@ def scramble_poly2(A):
     return B
 
 def scramble_poly1_with_steps(A):
-    """Возвращает (B, список строк пошагового вывода). Полином: B_i = A_i ⊕ B_{i-3} ⊕ B_{i-5}. Индексация с 1."""
-    B = []
-    lines = []
-    for i in range(len(A)):
-        idx = i + 1  # 1-based
-        b_3 = B[i - 3] if i >= 3 else 0
-        b_5 = B[i - 5] if i >= 5 else 0
-        val = A[i] ^ b_3 ^ b_5
-        B.append(val)
-        a_val = A[i]
-        if i < 3:
-            expr = f"A_{idx}"
-        elif i < 5:
-            expr = f"A_{idx}⊕B_{idx-3}"
-        else:
-            expr = f"A_{idx}⊕B_{idx-3}⊕B_{idx-5}"
-        lines.append(f"B_{idx}\t= {expr}\t= {val}")
-    return B, lines
+    """Возвращает (B, список строк пошагового вывода). Полином: B_i = A_i ⊕ B_{i-3} ⊕ B_{i-5}. Индексация с 1.
+    Строки — из step_trace.ScramblerTrace (для длинных входов удобнее брать его lines() по диапазону)."""
+    data = np.packbits(np.array(A, dtype=np.uint8)).tobytes()  # хвост дополняется нулями
+    lines = list(step_trace.ScramblerTrace(data, (3, 5)).lines(0, len(A)))
+    return scramble_poly1(A), lines
 
 def bits_to_hex(bits):
     n = len(bits)
@@ -109,23 +98,11 @@ def main():
         B = B2
         print("\n--- Выбран полином 2: B_i = A_i ⊕ B_{i-5} ⊕ B_{i-7} ---")
         print("Обоснование: полином 1 даёт макс. серию n =", run1, ", полином 2 — n =", run2, ", исходная —", run_orig, ". Выбираем полином 2 (меньшая макс. серия).")
-        steps = []
-        for i in range(len(A)):
-            idx = i + 1
-            val = B[i]
-            a_val = A[i]
-            b_5 = B[i - 5] if i >= 5 else 0
-            b_7 = B[i - 7] if i >= 7 else 0
-            if i < 5:
-                expr = f"A_{idx}"
-            elif i < 7:
-                expr = f"A_{idx}⊕B_{idx-5}"
-            else:
-                expr = f"A_{idx}⊕B_{idx-5}⊕B_{idx-7}"
-            steps.append(f"B_{idx}\t= {expr}\t= {val}")
+        steps = list(step_trace.ScramblerTrace(bytes(HEX_BYTES), (5, 7)).lines(0, len(A)))
         poly_name = "B_i = A_i ⊕ B_{i-5} ⊕ B_{i-7}"
     else:
-        B, steps = scramble_poly1_with_steps(A)
+        B = B1
+        steps = list(step_trace.ScramblerTrace(bytes(HEX_BYTES), (3, 5)).lines(0, len(A)))
         print("\n--- Выбран полином 1: B_i = A_i ⊕ B_{i-3} ⊕ B_{i-5} ---")
         print("Обоснование: меньшая задержка обратной связи (3 и 5 тактов), проще реализация. Макс. серия n =", run1, ".")
         poly_name = "B_i = A_i ⊕ B_{i-3} ⊕ B_{i-5}"
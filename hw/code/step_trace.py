@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Ленивый пошаговый вывод кодирования для любого диапазона бит: строки вида
+«B_7 = A_7⊕B_4⊕B_2 = 1» выдаются генератором только для запрошенного диапазона,
+поэтому вход может быть сколь угодно большим (файл читается через mmap).
+Им пользуется пошаговый расчёт в scrambler_encoding.py.
+
+Состояние кодера (регистр скремблера, чётность единиц для AMI) запоминается в контрольных
+точках через каждые checkpoint_bytes байт. Точки строятся лениво, только до блока
+с началом запрошенного диапазона, и переиспользуются следующими запросами,
+поэтому вывод начинается с ближайшей точки, а не с бита 0. NRZ, RZ, манчестер
+и 4B/5B состояния не имеют. Индексация в строках — с 1, как в отчётах.
+"""
+
+import argparse
+import mmap
+import sys
+
+import numpy as np
+
+import line_codes
+
+HEX_BYTES = [0xC0, 0xC0, 0xC4]  # "ААД"
+
+class BitTrace:
+    """Основа: случайный доступ к битам data (MSB first) и генератор строк lines(start, stop)."""
+
+    def __init__(self, data):
+        self.data = memoryview(data).cast('B')
+        self.n_bits = len(self.data) * 8
+
+    def bit(self, i):
+        return (self.data[i >> 3] >> (7 - (i & 7))) & 1
+
+    def _range(self, start, stop):
+        stop = self.n_bits if stop is None else min(stop, self.n_bits)
+        if not 0 <= start <= stop:
+            raise ValueError("Неверный диапазон бит")
+        return start, stop
+
+    def lines(self, start=0, stop=None):
+        """Строки для бит [start, stop) (0-based)."""
+        start, stop = self._range(start, stop)
+        for i in range(start, stop):
+            yield self.line(i, self.bit(i))
+
+class CheckpointTrace(BitTrace):
+    """Трасса с состоянием: состояние в начале каждого блока checkpoint_bytes байт
+    запоминается по мере надобности — только до блока с началом запрошенного диапазона."""
+
+    INITIAL_STATE = 0
+
+    def __init__(self, data, checkpoint_bytes=4096):
+        super().__init__(data)
+        self.checkpoint_bytes = checkpoint_bytes
+        self.checkpoints = [self.INITIAL_STATE]
+
+    def advance(self, state, chunk):
+        """Состояние после обработки байт chunk."""
+        raise NotImplementedError
+
+    def _state_at_byte(self, byte_index):
+        cp = byte_index // self.checkpoint_bytes
+        size = self.checkpoint_bytes
+        while len(self.checkpoints) <= cp:
+            pos = (len(self.checkpoints) - 1) * size
+            self.checkpoints.append(self.advance(self.checkpoints[-1], self.data[pos:pos + size]))
+        pos = cp * size
+        return self.advance(self.checkpoints[cp], self.data[pos:byte_index])
+
+class ScramblerTrace(CheckpointTrace):
+    """B_i = A_i ⊕ B_{i-t1} ⊕ B_{i-t2}; формат строк — как в scrambler_encoding.py."""
+
+    def __init__(self, data, taps=line_codes.POLY1, checkpoint_bytes=4096):
+        super().__init__(data, checkpoint_bytes)
+        self.taps = tuple(sorted(taps))
+        self.mask = (1 << max(self.taps)) - 1
+
+    def advance(self, state, chunk):
+        return line_codes.scramble_bytes(chunk, self.taps, state)[1]
+
+    def lines(self, start=0, stop=None):
+        start, stop = self._range(start, stop)
+        first = start & ~7
+        h = self._state_at_byte(first >> 3)  # младший бит — B_{i-1}
+        for i in range(first, stop):
+            a = self.bit(i)
+            b = a
+            for t in self.taps:
+                b ^= (h >> (t - 1)) & 1
+            h = ((h << 1) | b) & self.mask
+            if i >= start:
+                idx = i + 1
+                expr = f"A_{idx}" + "".join(f"⊕B_{idx - t}" for t in self.taps if i >= t)
+                yield f"B_{idx}\t= {expr}\t= {b}"
+
+class NRZTrace(BitTrace):
+    def line(self, i, b):
+        return f"{i + 1}: {b} → {'+1 (высокий)' if b else '-1 (низкий)'}"
+
+class RZTrace(BitTrace):
+    def line(self, i, b):
+        return f"{i + 1}: {b} → {'+1' if b else '-1'}, затем 0"
+
+class ManchesterTrace(BitTrace):
+    def line(self, i, b):
+        return f"{i + 1}: {b} → {'высокий→низкий' if b else 'низкий→высокий'}"
+
+class AMITrace(CheckpointTrace):
+    """Состояние — чётность числа единиц до точки (0 — следующая единица +1).
+    Чётность блока — чётность единиц в XOR всех его байт, без распаковки в биты."""
+
+    def advance(self, state, chunk):
+        folded = int(np.bitwise_xor.reduce(np.frombuffer(chunk, dtype=np.uint8))) if len(chunk) else 0
+        return state ^ (bin(folded).count('1') & 1)
+
+    def lines(self, start=0, stop=None):
+        start, stop = self._range(start, stop)
+        parity = self._state_at_byte(start >> 3)
+        parity ^= sum(self.bit(i) for i in range(start & ~7, start)) & 1
+        next_one = -1 if parity else 1
+        for i in range(start, stop):
+            b = self.bit(i)
+            if b:
+                level = next_one
+                next_one = -next_one
+                yield f"{i + 1}: 1 → {level:+d} (следующая единица: {next_one:+d})"
+            else:
+                yield f"{i + 1}: 0 → 0"
+
+class Trace4B5B(BitTrace):
+    """Строка на каждую тетраду, пересекающую диапазон бит."""
+
+    def lines(self, start=0, stop=None):
+        start, stop = self._range(start, stop)
+        for k in range(start // 4, (stop + 3) // 4):
+            nibble = "".join(str(self.bit(4 * k + j)) for j in range(4))
+            code = format(int(line_codes.TABLE_4B5B[int(nibble, 2)]), '05b')
+            yield f"{k + 1} (биты {4 * k + 1}–{4 * k + 4}): {nibble} → {code}"
+
+TRACES = {
+    'scr1': lambda data: ScramblerTrace(data, line_codes.POLY1),
+    'scr2': lambda data: ScramblerTrace(data, line_codes.POLY2),
+    'nrz': NRZTrace,
+    'ami': AMITrace,
+    'rz': RZTrace,
+    'manchester': ManchesterTrace,
+    '4b5b': Trace4B5B,
+}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--code', choices=list(TRACES), default='scr2')
+    ap.add_argument('--file', help='входные данные (по умолчанию «ААД»)')
+    ap.add_argument('--from', dest='first', type=int, default=1, help='первый бит (с 1)')
+    ap.add_argument('--to', dest='last', type=int, help='последний бит (включительно)')
+    args = ap.parse_args()
+
+    if args.file:
+        # Файл не читается целиком: биты берутся из отображения в память
+        with open(args.file, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        data = bytes(HEX_BYTES)
+    trace = TRACES[args.code](data)
+    for line in trace.lines(args.first - 1, args.last):
+        sys.stdout.write(line + "\n")
+
+if __name__ == "__main__":
+    main()